@@ -1,8 +1,23 @@
 import os
 import sys
 import shutil
-from PyQt6.QtCore import Qt, QObject, pyqtSignal, QThread
-from PyQt6.QtGui import QPalette, QColor
+import hashlib
+import time
+from functools import lru_cache
+from collections import deque
+from typing import Optional
+from PyQt6.QtCore import (
+    Qt,
+    QObject,
+    pyqtSignal,
+    QThreadPool,
+    QRunnable,
+    QMutex,
+    QMutexLocker,
+    QTimer,
+    QSettings,
+)
+from PyQt6.QtGui import QPalette, QColor, QTextCursor
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -19,46 +34,235 @@ from PyQt6.QtWidgets import (
     QFormLayout,
     QMessageBox,
 )
-import yt_dlp
-
 
-class DownloadWorker(QObject):
+LOG_FLUSH_INTERVAL_MS = 100
+LOG_MAX_BLOCKS = 2000
+PROGRESS_MIN_INTERVAL = 0.1
+PROGRESS_IDLE_INTERVAL = 1.0
+
+LIGHT_QSS = """
+QLineEdit, QPlainTextEdit {
+    border: 1px solid #D0D0D0;
+    border-radius: 6px;
+    padding: 6px;
+    background: #FFFFFF;
+}
+QPushButton {
+    border: 1px solid #C8D6E5;
+    border-radius: 6px;
+    padding: 8px 12px;
+    background: #E3F2FD;
+    color: #0D47A1;
+}
+QPushButton:disabled {
+    background: #EEEEEE;
+    color: #888888;
+}
+QGroupBox {
+    border: 1px solid #E0E0E0;
+    border-radius: 8px;
+    margin-top: 12px;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    subcontrol-position: top left;
+    padding: 0 6px;
+}
+QProgressBar {
+    border: 1px solid #D0D0D0;
+    border-radius: 6px;
+    text-align: center;
+    height: 20px;
+}
+QProgressBar::chunk {
+    background-color: #64B5F6;
+    border-radius: 6px;
+}
+"""
+
+
+@lru_cache(maxsize=None)
+def _light_palette() -> QPalette:
+    palette = QPalette()
+    palette.setColor(QPalette.ColorRole.Window, QColor("#FFFFFF"))
+    palette.setColor(QPalette.ColorRole.WindowText, QColor("#222222"))
+    palette.setColor(QPalette.ColorRole.Base, QColor("#FAFAFA"))
+    palette.setColor(QPalette.ColorRole.AlternateBase, QColor("#F0F0F0"))
+    palette.setColor(QPalette.ColorRole.ToolTipBase, QColor("#FFFFFF"))
+    palette.setColor(QPalette.ColorRole.ToolTipText, QColor("#222222"))
+    palette.setColor(QPalette.ColorRole.Text, QColor("#222222"))
+    palette.setColor(QPalette.ColorRole.Button, QColor("#F7F7F7"))
+    palette.setColor(QPalette.ColorRole.ButtonText, QColor("#222222"))
+    palette.setColor(QPalette.ColorRole.Highlight, QColor("#1976D2"))
+    palette.setColor(QPalette.ColorRole.HighlightedText, QColor("#FFFFFF"))
+    return palette
+
+
+def _find_ffmpeg() -> Optional[str]:
+    # shutil.which walks every PATH entry; reuse the last hit while PATH is unchanged
+    settings = QSettings("youtubedownloader", "ytdl")
+    path_env = os.environ.get("PATH", "")
+    path_hash = hashlib.sha1(path_env.encode("utf-8", "surrogatepass")).hexdigest()
+    cached = settings.value("ffmpeg/path", "", type=str)
+    if (
+        cached
+        and settings.value("ffmpeg/path_hash", "", type=str) == path_hash
+        and os.path.exists(cached)
+    ):
+        return cached
+    found = shutil.which("ffmpeg")
+    settings.setValue("ffmpeg/path", found or "")
+    settings.setValue("ffmpeg/path_hash", path_hash)
+    return found
+
+
+class DownloadSignals(QObject):
+    # QRunnable is not a QObject, so the worker's signals live here
     progress = pyqtSignal(int, str)
-    log = pyqtSignal(str)
+    log = pyqtSignal(list)
     finished = pyqtSignal()
     error = pyqtSignal(str)
 
-    def __init__(self, url: str, output_dir: str, ffmpeg_available: bool):
+
+class DownloadWorker(QRunnable):
+    PLAYLIST_WORKERS = 4
+    # the id keeps same-titled videos from sharing one .part/merge target
+    NAME_TEMPLATE = "%(title)s [%(id)s].%(ext)s"
+
+    # static yt-dlp options; build_opts() adds the per-run fields
+    _OPTS_PLAIN = {
+        "ignoreerrors": True,
+        "concurrent_fragment_downloads": 8,
+        "http_chunk_size": 10 * 1024 * 1024,
+        "buffersize": 1024 * 1024,
+        # stream into <name>.part on disk and resume/retry instead of restarting
+        "noprogress": False,
+        "continuedl": True,
+        "nopart": False,
+        "retries": 10,
+        "fragment_retries": 10,
+        "socket_timeout": 15,
+        "format": "best[ext=mp4]/best",
+    }
+    _OPTS_FFMPEG = {
+        **_OPTS_PLAIN,
+        "merge_output_format": "mp4",
+        "format": "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+    }
+
+    def __init__(self, url: str, output_dir: str, ffmpeg_path: Optional[str]):
         super().__init__()
+        # MainWindow keeps a reference and drains the log after the run ends
+        self.setAutoDelete(False)
+        self.signals = DownloadSignals()
         self.url = url
         self.output_dir = output_dir
-        self.ffmpeg_available = ffmpeg_available
+        self.ffmpeg_path = ffmpeg_path
+        self.ffmpeg_available = ffmpeg_path is not None
         self._logger = self._build_logger()
+        self._entry_count = 0
+        self._entry_percent = {}
+        self._entry_prefixes = {}
+        self._entry_mutex = QMutex()
+        self._cached_prefix = ""
+        self._cached_file_key = None
+        self._log_buffer = deque()
+        self._log_mutex = QMutex()
+        self._last_emit_ts = 0.0
+        self._last_pct = -1
+        self._progress_mutex = QMutex()
+        self._cancelled = False
 
     def _build_logger(self):
         # yt-dlp logger bridge to forward messages into UI
         class _Logger:
+            _warn_prefix = "경고: "
+            _error_prefix = "오류: "
+
             def __init__(self, emit):
                 self.emit = emit
 
+            @staticmethod
+            def _text(msg):
+                # non-str fallback; the str fast path is inlined in each method
+                if isinstance(msg, (bytes, bytearray)):
+                    return msg.decode("utf-8", "ignore")
+                return str(msg)
+
             def debug(self, msg):
-                if isinstance(msg, bytes):
-                    msg = msg.decode(errors="ignore")
-                self.emit(str(msg))
+                self.emit(msg if msg.__class__ is str else self._text(msg))
 
             def warning(self, msg):
-                if isinstance(msg, bytes):
-                    msg = msg.decode(errors="ignore")
-                self.emit(f"경고: {msg}")
+                self.emit(self._warn_prefix + (msg if msg.__class__ is str else self._text(msg)))
 
             def error(self, msg):
-                if isinstance(msg, bytes):
-                    msg = msg.decode(errors="ignore")
-                self.emit(f"오류: {msg}")
-
-        return _Logger(self.log.emit)
-
-    def _progress_hook(self, d):
+                self.emit(self._error_prefix + (msg if msg.__class__ is str else self._text(msg)))
+
+        return _Logger(self.queue_log)
+
+    def queue_log(self, msg: str):
+        with QMutexLocker(self._log_mutex):
+            self._log_buffer.append(msg)
+
+    def flush_log(self):
+        # called periodically from the GUI thread; emits buffered lines as one batch
+        with QMutexLocker(self._log_mutex):
+            if not self._log_buffer:
+                return
+            batch = list(self._log_buffer)
+            self._log_buffer.clear()
+        self.signals.log.emit(batch)
+
+    def _playlist_prefix(self, info, filename, index=None):
+        # the prefix only changes when a new file starts, so rebuild it only then
+        if index is not None:
+            return self._entry_prefixes[index]
+        key = (info.get("playlist_index"), info.get("playlist_count"), filename)
+        if key != self._cached_file_key:
+            p_index, p_count, _ = key
+            if isinstance(p_index, int) and isinstance(p_count, int) and p_count > 0:
+                self._cached_prefix = f"[{p_index}/{p_count}] "
+            else:
+                self._cached_prefix = ""
+            self._cached_file_key = key
+        return self._cached_prefix
+
+    def _overall_percent(self, index, percent):
+        # playlist entries download in parallel; report the unweighted mean over all items,
+        # since sizes of entries that haven't started yet are unknown
+        if index is None:
+            return percent
+        with QMutexLocker(self._entry_mutex):
+            self._entry_percent[index] = percent
+            return int(sum(self._entry_percent.values()) / self._entry_count)
+
+    def _emit_progress(self, percent, desc, force=False):
+        # cap at ~10 Hz; an unchanged percentage only refreshes speed/ETA once a second
+        now = time.monotonic()
+        with QMutexLocker(self._progress_mutex):
+            elapsed = now - self._last_emit_ts
+            if not force and (
+                elapsed < PROGRESS_MIN_INTERVAL
+                or (percent == self._last_pct and elapsed < PROGRESS_IDLE_INTERVAL)
+            ):
+                return
+            self._last_emit_ts = now
+            self._last_pct = percent
+        self.signals.progress.emit(percent, desc)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        # checked from the progress hook; yt-dlp aborts on the next tick
+        self._cancelled = True
+
+    def progress_hook(self, d, index=None):
+        if self._cancelled:
+            from yt_dlp.utils import DownloadCancelled
+
+            raise DownloadCancelled()
         if d.get("status") == "downloading":
             total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
             downloaded = d.get("downloaded_bytes") or 0
@@ -66,52 +270,101 @@ class DownloadWorker(QObject):
             speed = d.get("speed")
             eta = d.get("eta")
             info = d.get("info_dict") or {}
-            p_index = info.get("playlist_index")
-            p_count = info.get("playlist_count")
-            prefix = ""
-            if isinstance(p_index, int) and isinstance(p_count, int) and p_count > 0:
-                prefix = f"[{p_index}/{p_count}] "
-            desc = prefix
+            desc = self._playlist_prefix(info, d.get("filename"), index)
             if speed:
-                desc += f"{int(speed/1024)} KB/s "
+                desc += f"{int(speed) >> 10} KB/s "
             if eta is not None:
                 desc += f"ETA {eta}s"
-            self.progress.emit(percent, desc.strip())
+            self._emit_progress(self._overall_percent(index, percent), desc.strip())
         elif d.get("status") == "finished":
             info = d.get("info_dict") or {}
-            p_index = info.get("playlist_index")
-            p_count = info.get("playlist_count")
-            prefix = ""
-            if isinstance(p_index, int) and isinstance(p_count, int) and p_count > 0:
-                prefix = f"[{p_index}/{p_count}] "
-            self.progress.emit(100, f"{prefix}병합 중".strip())
+            prefix = self._playlist_prefix(info, d.get("filename"), index)
+            self._emit_progress(
+                self._overall_percent(index, 100), f"{prefix}병합 중".strip(), force=True
+            )
+
+    def build_opts(self, progress_hook):
+        outtmpl = os.path.join(self.output_dir, self.NAME_TEMPLATE)
+        opts = {
+            **(self._OPTS_FFMPEG if self.ffmpeg_available else self._OPTS_PLAIN),
+            "outtmpl": {"default": outtmpl},
+            "progress_hooks": [progress_hook],
+            "logger": self._logger,
+        }
+        if self.ffmpeg_path:
+            opts["ffmpeg_location"] = self.ffmpeg_path
+        return opts
+
+    def _download_entries(self, entries):
+        unique = {}
+        for entry in entries:
+            if entry:
+                url = entry.get("url") or entry.get("webpage_url") or entry.get("id")
+                unique.setdefault((entry.get("ie_key"), url), entry)
+        entries = list(unique.values())
+        self._entry_count = len(entries)
+        self._entry_percent = {}
+        # built up front so pool threads only ever read it
+        self._entry_prefixes = {
+            i: f"[{i}/{len(entries)}] " for i in range(1, len(entries) + 1)
+        }
+        self.queue_log(f"재생목록 {len(entries)}개 항목 다운로드")
+        # dedicated pool so the cap doesn't leak into QThreadPool.globalInstance()
+        pool = QThreadPool()
+        pool.setMaxThreadCount(self.PLAYLIST_WORKERS)
+        for index, entry in enumerate(entries, start=1):
+            pool.start(_PlaylistEntryTask(self, index, entry))
+        pool.waitForDone()
 
     def run(self):
         try:
-            outtmpl = os.path.join(self.output_dir, "%(title)s.%(ext)s")
-            if self.ffmpeg_available:
-                ydl_opts = {
-                    "outtmpl": outtmpl,
-                    "ignoreerrors": True,
-                    "merge_output_format": "mp4",
-                    "format": "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
-                    "progress_hooks": [self._progress_hook],
-                    "logger": self._logger,
-                }
-            else:
-                ydl_opts = {
-                    "outtmpl": outtmpl,
-                    "ignoreerrors": True,
-                    "format": "best[ext=mp4]/best",
-                    "progress_hooks": [self._progress_hook],
-                    "logger": self._logger,
-                }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                self.log.emit("정보 수집 중")
-                ydl.download([self.url])
-            self.finished.emit()
+            import yt_dlp
+
+            entries = None
+            with yt_dlp.YoutubeDL(self.build_opts(self.progress_hook)) as ydl:
+                self.queue_log("정보 수집 중")
+                first = info = ydl.extract_info(self.url, download=False, process=False)
+                transparent = False
+                while info and info.get("_type") in ("url", "url_transparent"):
+                    transparent = transparent or info["_type"] == "url_transparent"
+                    info = ydl.extract_info(
+                        info["url"], download=False, ie_key=info.get("ie_key"), process=False
+                    )
+                # nested playlists (e.g. channel tabs) are not flattened; each runs in one task
+                if info and info.get("_type") == "playlist":
+                    entries = list(info.get("entries") or [])
+                elif info:
+                    # url_transparent overrides are only merged by yt-dlp's own resolution
+                    ydl.process_ie_result(first if transparent else info, download=True)
+            if entries:
+                self._download_entries(entries)
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+
+class _PlaylistEntryTask(QRunnable):
+    # one playlist item; owns its own YoutubeDL since instances aren't thread-safe
+    def __init__(self, worker: DownloadWorker, index: int, entry: dict):
+        super().__init__()
+        self.worker = worker
+        self.index = index
+        self.entry = entry
+
+    def _progress_hook(self, d):
+        self.worker.progress_hook(d, self.index)
+
+    def run(self):
+        if self.worker.cancelled:
+            return
+        try:
+            import yt_dlp
+
+            with yt_dlp.YoutubeDL(self.worker.build_opts(self._progress_hook)) as ydl:
+                # process the unresolved entry so its ie_key and url_transparent fields apply
+                ydl.process_ie_result(self.entry, download=True)
         except Exception as e:
-            self.error.emit(str(e))
+            self.worker.queue_log(f"오류: {e}")
 
 
 class MainWindow(QMainWindow):
@@ -119,68 +372,14 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("YouTube 다운로더")
         self.setMinimumSize(720, 520)
-        self._apply_light_theme()
-        self.thread = None
         self.worker = None
-        self.ffmpeg_available = shutil.which("ffmpeg") is not None
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self._log_timer.timeout.connect(self._flush_log)
+        self.ffmpeg_path = _find_ffmpeg()
+        self.ffmpeg_available = self.ffmpeg_path is not None
         self._build_ui()
 
-    def _apply_light_theme(self):
-        palette = QPalette()
-        palette.setColor(QPalette.ColorRole.Window, QColor("#FFFFFF"))
-        palette.setColor(QPalette.ColorRole.WindowText, QColor("#222222"))
-        palette.setColor(QPalette.ColorRole.Base, QColor("#FAFAFA"))
-        palette.setColor(QPalette.ColorRole.AlternateBase, QColor("#F0F0F0"))
-        palette.setColor(QPalette.ColorRole.ToolTipBase, QColor("#FFFFFF"))
-        palette.setColor(QPalette.ColorRole.ToolTipText, QColor("#222222"))
-        palette.setColor(QPalette.ColorRole.Text, QColor("#222222"))
-        palette.setColor(QPalette.ColorRole.Button, QColor("#F7F7F7"))
-        palette.setColor(QPalette.ColorRole.ButtonText, QColor("#222222"))
-        palette.setColor(QPalette.ColorRole.Highlight, QColor("#1976D2"))
-        palette.setColor(QPalette.ColorRole.HighlightedText, QColor("#FFFFFF"))
-        self.setPalette(palette)
-        self.setStyleSheet(
-            """
-            QLineEdit, QPlainTextEdit {
-                border: 1px solid #D0D0D0;
-                border-radius: 6px;
-                padding: 6px;
-                background: #FFFFFF;
-            }
-            QPushButton {
-                border: 1px solid #C8D6E5;
-                border-radius: 6px;
-                padding: 8px 12px;
-                background: #E3F2FD;
-                color: #0D47A1;
-            }
-            QPushButton:disabled {
-                background: #EEEEEE;
-                color: #888888;
-            }
-            QGroupBox {
-                border: 1px solid #E0E0E0;
-                border-radius: 8px;
-                margin-top: 12px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 6px;
-            }
-            QProgressBar {
-                border: 1px solid #D0D0D0;
-                border-radius: 6px;
-                text-align: center;
-                height: 20px;
-            }
-            QProgressBar::chunk {
-                background-color: #64B5F6;
-                border-radius: 6px;
-            }
-            """
-        )
-
     def _build_ui(self):
         central = QWidget()
         root = QVBoxLayout()
@@ -239,6 +438,10 @@ class MainWindow(QMainWindow):
         log_layout = QVBoxLayout()
         self.log_view = QPlainTextEdit()
         self.log_view.setReadOnly(True)
+        self.log_view.document().setMaximumBlockCount(LOG_MAX_BLOCKS)
+        # held cursor pinned to the end of the log
+        self._log_cursor = self.log_view.textCursor()
+        self._log_cursor.movePosition(QTextCursor.MoveOperation.End)
         log_layout.addWidget(self.log_view)
         log_group.setLayout(log_layout)
         root.addWidget(log_group)
@@ -264,51 +467,96 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "입력 오류", "유효한 폴더가 아닙니다.")
             return
         self.start_btn.setEnabled(False)
+        self.progress.setFormat("%p%")
         self.progress.setValue(0)
         self.status_label.setText("시작 중")
         self.log_view.clear()
-        self.thread = QThread()
-        self.worker = DownloadWorker(url, output_dir, self.ffmpeg_available)
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
-        self.worker.progress.connect(self.on_progress)
-        self.worker.log.connect(self.append_log)
-        self.worker.finished.connect(self.on_finished)
-        self.worker.error.connect(self.on_error)
-        self.thread.start()
+        self.worker = DownloadWorker(url, output_dir, self.ffmpeg_path)
+        signals = self.worker.signals
+        # keep every connect() in bound-method form; no string-based SIGNAL()/SLOT() lookups
+        signals.progress.connect(self.on_progress, Qt.ConnectionType.QueuedConnection)
+        # flush_log() is called from the GUI thread, so `log` stays direct to preserve ordering
+        signals.log.connect(self.append_log_batch, Qt.ConnectionType.DirectConnection)
+        signals.finished.connect(self.on_finished, Qt.ConnectionType.QueuedConnection)
+        signals.error.connect(self.on_error, Qt.ConnectionType.QueuedConnection)
+        QThreadPool.globalInstance().start(self.worker)
+        self._log_timer.start()
+
+    def closeEvent(self, event):
+        if self.worker and not self.start_btn.isEnabled():
+            answer = QMessageBox.question(
+                self,
+                "다운로드 중",
+                "다운로드가 진행 중입니다. 취소하고 종료할까요?",
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+            self.worker.cancel()
+            self._log_timer.stop()
+        super().closeEvent(event)
 
     def on_progress(self, value: int, desc: str):
+        # the bar carries the per-tick text; status_label only changes on state transitions
+        self.progress.setFormat(f"%p% - {desc}" if desc else "%p%")
         self.progress.setValue(value)
-        self.status_label.setText(f"진행률 {value}%{(' - ' + desc) if desc else ''}")
 
     def append_log(self, text: str):
-        self.log_view.appendPlainText(text)
+        self.append_log_batch([text])
+
+    def append_log_batch(self, lines: list):
+        # batches arrive at most every LOG_FLUSH_INTERVAL_MS, so scrolling here is rate-limited too
+        scrollbar = self.log_view.verticalScrollBar()
+        # only follow the tail if the user hasn't scrolled up
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        self.log_view.setUpdatesEnabled(False)
+        self._log_cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not self.log_view.document().isEmpty():
+            self._log_cursor.insertBlock()
+        self._log_cursor.insertText("\n".join(lines))
+        self.log_view.setUpdatesEnabled(True)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def _flush_log(self):
+        if self.worker:
+            self.worker.flush_log()
+
+    def _stop_log_timer(self):
+        self._log_timer.stop()
+        self._flush_log()
 
     def on_finished(self):
+        self._stop_log_timer()
         self.append_log("완료")
+        self.progress.setFormat("%p%")
         self.status_label.setText("완료")
         self.start_btn.setEnabled(True)
-        if self.thread:
-            self.thread.quit()
-            self.thread.wait()
-            self.thread = None
-            self.worker = None
 
     def on_error(self, message: str):
+        self._stop_log_timer()
         self.append_log(f"오류: {message}")
+        self.progress.setFormat("%p%")
         self.status_label.setText("오류")
         self.start_btn.setEnabled(True)
-        if self.thread:
-            self.thread.quit()
-            self.thread.wait()
-            self.thread = None
-            self.worker = None
+
+
+class _ImportWarmupTask(QRunnable):
+    # yt-dlp is imported lazily so the window paints first; load it in the background
+    def run(self):
+        try:
+            import yt_dlp  # noqa: F401
+        except ImportError:
+            pass
 
 
 def main():
     app = QApplication(sys.argv)
+    app.setPalette(_light_palette())
+    app.setStyleSheet(LIGHT_QSS)
     window = MainWindow()
     window.show()
+    QThreadPool.globalInstance().start(_ImportWarmupTask())
     sys.exit(app.exec())
 
 